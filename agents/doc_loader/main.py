@@ -8,8 +8,8 @@ from news_loader import *
 from techmeme_loader import *
 from unified_news_loader import *
 from pathlib import Path
-from datetime import datetime, timedelta
-import time
+from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.triggers.cron import CronTrigger
 
 load_dotenv()
 OPEN_AI_KEY = os.environ.get("OPENAI_API_KEY")
@@ -18,20 +18,13 @@ llm = ChatOpenAI(model="gpt-4o-mini", api_key=OPEN_AI_KEY)
 output_parser = StrOutputParser()
 rss_url = "https://news.mit.edu/topic/mitartificial-intelligence2-rss.xml"
 
-def _sleep_until(target_dt: datetime):
-    """Sleep until the specified datetime (local time)."""
-    now = datetime.now()
-    seconds = (target_dt - now).total_seconds()
-    if seconds > 0:
-        time.sleep(seconds)
-
-def _next_run_datetime(hour: int, minute: int = 0) -> datetime:
-    """Get the next datetime (today or tomorrow) at the specified local time."""
-    now = datetime.now()
-    candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-    if candidate <= now:
-        candidate = candidate + timedelta(days=1)
-    return candidate
+def _scheduled_run():
+    """Job executed by the daily scheduler."""
+    print("\n🚀 Starting scheduled run...")
+    try:
+        main()
+    except Exception as run_err:
+        print(f"❌ Scheduled run failed: {run_err}")
 
 def main():
     """Main function to run the news processing pipeline"""
@@ -60,7 +53,6 @@ def main():
         # Step 3: Generate combined weekly JSON with summaries from all sources
         print(f"\n📅 Step 3: Generating combined weekly summary for {current_week}...")
         create_combined_weekly_data(current_week)
-        print("✅ Combined weekly JSON with summaries completed")
 
 
         print(f"\n🎉 Pipeline completed successfully for week {current_week}!")
@@ -80,20 +72,19 @@ def run_daily(hour: int = 7, minute: int = 0):
     print(f"⏰ Daily scheduler started. Will run every day at {hour:02d}:{minute:02d} (local time).")
     print("Press Ctrl+C to stop.")
     print("=" * 50)
+    scheduler = BlockingScheduler()
+    # A run missed while the machine was asleep still fires within the grace time,
+    # and several missed runs collapse into one.
+    scheduler.add_job(
+        _scheduled_run,
+        CronTrigger(hour=hour, minute=minute),
+        misfire_grace_time=3600,
+        max_instances=1,
+        coalesce=True,
+    )
     try:
-        while True:
-            next_run = _next_run_datetime(hour, minute)
-            print(f"🕗 Next run scheduled at: {next_run.strftime('%Y-%m-%d %H:%M:%S')}")
-            _sleep_until(next_run)
-            print("\n🚀 Starting scheduled run...")
-            try:
-                main()
-            except Exception as run_err:
-                print(f"❌ Scheduled run failed: {run_err}")
-            # After run, schedule the next day
-            # Small sleep to avoid tight loop in case run finished exactly at boundary
-            time.sleep(1)
-    except KeyboardInterrupt:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
         print("\n🛑 Daily scheduler stopped by user.")
 
 
@@ -151,7 +142,6 @@ if __name__ == "__main__":
             # Step 3: Generate combined weekly JSON with summaries from all sources
             print(f"\n📅 Step 3: Generating combined weekly summary for {current_week}...")
             create_combined_weekly_data(current_week)
-            print("✅ Combined weekly JSON with summaries completed")
             
             
         elif command == "week":
@@ -168,7 +158,6 @@ if __name__ == "__main__":
             # Generate combined weekly summary for specified week from all sources
             print(f"📅 Generating combined weekly summary for {week_tag}...")
             create_combined_weekly_data(week_tag)
-            print("✅ Combined weekly summary generated")
             
                 
         elif command == "fetch":
@@ -186,7 +175,6 @@ if __name__ == "__main__":
             else:
                 print("🔄 Creating combined weekly file for current week...")
                 create_combined_weekly_data()
-            print("✅ Combined weekly file created")
             
         elif command == "list":
             # List available weeks
@@ -3,11 +3,17 @@ from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 import os
-import json
+import orjson
+import asyncio
+import functools
+import email.utils
+import re
 from dotenv import load_dotenv
+import aiohttp
 import feedparser
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
+from pathlib import Path
 import hashlib
 import pytz
 from dateutil import parser as date_parser
@@ -19,9 +25,25 @@ llm = ChatOpenAI(model="gpt-4o-mini", api_key=OPEN_AI_KEY)
 output_parser = StrOutputParser()
 rss_url = "https://news.mit.edu/topic/mitartificial-intelligence2-rss.xml"
 
+# Resolve data paths from this file so the loaders work from any working directory
+DATA_DIR = Path(__file__).resolve().parent.parent.parent / "data"
+DATA_DIR.mkdir(parents=True, exist_ok=True)
+RSS_STATE_FILE = DATA_DIR / "rss_state.json"
+
+# Stop scanning the feed after this many already-stored entries in a row
+MAX_CONSECUTIVE_KNOWN = 3
+
+# Built once and shared by every summarization call
+_SUMMARY_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are a helpful summarizer of current AI trend news. Make a single-sentence summary of the provided news."),
+    ("human", "{news_text}"),
+])
+_SUMMARY_CHAIN = _SUMMARY_PROMPT | llm | output_parser
+
 def get_article_id(entry):
+    """Generate unique ID for article based on link and title"""
     unique_string = entry.get("link", "") + entry.get("title", "")
-    return hashlib.md5(unique_string.encode("utf-8")).hexdigest()
+    return hashlib.blake2b(unique_string.encode("utf-8"), digest_size=8).hexdigest()
 
 def get_week_start_end(target_date=None):
     """Get the start (Monday) and end (Sunday) of current week or specified date's week"""
@@ -55,65 +77,78 @@ def get_week_tag(target_date=None):
     if isinstance(target_date, str):
         target_date = datetime.fromisoformat(target_date.replace('Z', '+00:00'))
     
-    if target_date.tzinfo is not None:
-        target_date = target_date.replace(tzinfo=None)
-    
-    year, week_num, _ = target_date.isocalendar()
-    return f"{year}-W{week_num:02d}"
-
+    return _week_tag_for_date(target_date.year, target_date.month, target_date.day)
+
+@functools.lru_cache(maxsize=4096)
+def _week_tag_for_date(year, month, day):
+    """ISO week tag for a calendar day, cached since many articles share a day"""
+    iso_year, week_num, _ = datetime(year, month, day).isocalendar()
+    return f"{iso_year}-W{week_num:02d}"
+
+# Fallback formats for strings neither RFC 822 nor dateutil can handle
+DATE_FORMATS = (
+    "%a, %d %b %Y %H:%M:%S %z",  # RFC 822
+    "%a, %d %b %Y %H:%M:%S GMT", # GMT format
+    "%a, %d %b %Y %H:%M:%S",     # No timezone
+    "%Y-%m-%dT%H:%M:%S%z",       # ISO 8601 with tz
+    "%Y-%m-%dT%H:%M:%S",         # ISO 8601 no tz
+    "%Y-%m-%d %H:%M:%S",         # Simple format
+    "%Y-%m-%d",                  # Date only
+)
+
+# Shape of an RFC 822 date ("[Wed, ]03 Sep 2025 ..."); email.utils mis-parses other formats
+_RFC822_DATE_RE = re.compile(r"\s*(?:[A-Za-z]{3}, )?\d{1,2} [A-Za-z]{3} \d{4} ")
+
+@functools.lru_cache(maxsize=4096)
 def parse_article_date(date_string):
-    """Parse RSS date string to datetime object with better error handling"""
+    """Parse RSS date string to datetime object with better error handling.
+
+    Results are memoized since the same strings are re-parsed as sort keys.
+    """
     if not date_string:
         return None
     
+    # Fast path: RSS dates are almost always RFC 822, which the email module parses directly
+    if _RFC822_DATE_RE.match(date_string):
+        try:
+            return email.utils.parsedate_to_datetime(date_string).replace(tzinfo=None)
+        except (TypeError, ValueError):
+            pass
+    
     try:
-        # First try dateutil parser which handles most formats
+        # Then try dateutil parser which handles most other formats
         parsed_date = date_parser.parse(date_string)
         # Convert to naive datetime for consistent comparison
-        if parsed_date.tzinfo is not None:
-            parsed_date = parsed_date.replace(tzinfo=None)
-        return parsed_date
+        return parsed_date.replace(tzinfo=None)
     except Exception:
         pass
     
     # Fallback to manual parsing
-    try:
-        formats = [
-            "%a, %d %b %Y %H:%M:%S %z",  # RFC 822
-            "%a, %d %b %Y %H:%M:%S GMT", # GMT format
-            "%a, %d %b %Y %H:%M:%S",     # No timezone
-            "%Y-%m-%dT%H:%M:%S%z",       # ISO 8601 with tz
-            "%Y-%m-%dT%H:%M:%S",         # ISO 8601 no tz
-            "%Y-%m-%d %H:%M:%S",         # Simple format
-            "%Y-%m-%d",                  # Date only
-        ]
-        
-        for fmt in formats:
-            try:
-                parsed_date = datetime.strptime(date_string, fmt)
-                # Remove timezone info if present
-                if parsed_date.tzinfo is not None:
-                    parsed_date = parsed_date.replace(tzinfo=None)
-                return parsed_date
-            except ValueError:
-                continue
-    except Exception:
-        pass
+    for fmt in DATE_FORMATS:
+        try:
+            # Remove timezone info if present
+            return datetime.strptime(date_string, fmt).replace(tzinfo=None)
+        except ValueError:
+            continue
     
     print(f"Warning: Could not parse date string: {date_string}")
     return None
 
+def article_date_key(article):
+    """Sort key for newest-first ordering; undated articles sort last"""
+    return parse_article_date(article.get("date", "")) or datetime.min
+
 def tag_weekly_articles():
     """Load existing JSON and tag articles with their respective weeks"""
-    file_path = "../../data/mit_ai_news.json"
+    file_path = str(DATA_DIR / "mit_ai_news.json")
     
     if not os.path.exists(file_path):
         print("No existing articles file found.")
         return
     
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            articles = json.load(f)
+        with open(file_path, "rb") as f:
+            articles = orjson.loads(f.read())
         
         updated_count = 0
         
@@ -135,8 +170,8 @@ def tag_weekly_articles():
                     updated_count += 1
         
         # Save updated articles
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(articles, f, ensure_ascii=False, indent=4)
+        with open(file_path, "wb") as f:
+            f.write(orjson.dumps(articles, option=orjson.OPT_INDENT_2))
         
         print(f"Updated {updated_count} articles with week tags")
             
@@ -148,24 +183,21 @@ def get_articles_for_week(week_tag=None):
     if week_tag is None:
         week_tag = get_week_tag()
     
-    file_path = "../../data/mit_ai_news.json"
+    file_path = str(DATA_DIR / "mit_ai_news.json")
     
     if not os.path.exists(file_path):
         print("No existing articles file found.")
         return []
     
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            articles = json.load(f)
+        with open(file_path, "rb") as f:
+            articles = orjson.loads(f.read())
         
         # Filter articles by week tag
-        weekly_articles = []
-        for article in articles:
-            if article.get("week") == week_tag:
-                weekly_articles.append(article)
+        weekly_articles = [article for article in articles if article.get("week") == week_tag]
         
         # Sort by date (newest first)
-        weekly_articles.sort(key=lambda x: parse_article_date(x.get("date", "")) or datetime.min, reverse=True)
+        weekly_articles.sort(key=article_date_key, reverse=True)
         
         return weekly_articles
         
@@ -181,14 +213,14 @@ def process_specific_week(week_tag):
 
 def list_available_weeks():
     """List all weeks that have articles"""
-    file_path = "../../data/mit_ai_news.json"
+    file_path = str(DATA_DIR / "mit_ai_news.json")
     if not os.path.exists(file_path):
         print("No articles file found")
         return []
     
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            articles = json.load(f)
+        with open(file_path, "rb") as f:
+            articles = orjson.loads(f.read())
         
         week_counts = {}
         for article in articles:
@@ -241,11 +273,9 @@ def doc_loader(file_path):
                 "content": doc.page_content,
                 "processed_at": datetime.now().isoformat()
             })
-            
-        os.makedirs("../../data", exist_ok=True)        
         
-        with open("../../documents.json", "w", encoding="utf-8") as f:
-            json.dump(data_list, f, ensure_ascii=False, indent=4)
+        with open(DATA_DIR.parent / "documents.json", "wb") as f:
+            f.write(orjson.dumps(data_list, option=orjson.OPT_INDENT_2))
         
         return {"news_text": documents[0].page_content if documents else ""}
         
@@ -254,11 +284,65 @@ def doc_loader(file_path):
         return {"news_text": ""}
 
 # ==================================================================== #
+def load_feed_state(url=rss_url):
+    """Return the ETag/Last-Modified validators saved from the last fetch of a feed"""
+    if not RSS_STATE_FILE.exists():
+        return {}
+    return orjson.loads(RSS_STATE_FILE.read_bytes()).get(url, {})
+
+def save_feed_state(feed, url=rss_url):
+    """Remember the feed's validators so the next fetch can be a conditional GET"""
+    state = orjson.loads(RSS_STATE_FILE.read_bytes()) if RSS_STATE_FILE.exists() else {}
+    state[url] = {"etag": feed.get("etag"), "modified": feed.get("modified")}
+    RSS_STATE_FILE.write_bytes(orjson.dumps(state, option=orjson.OPT_INDENT_2))
+
 def fetch_mit_news(max_articles=5):
     """Fetch and process MIT AI news from RSS feed, avoiding duplicates"""
     try:
         print("Fetching RSS feed...")
-        feed = feedparser.parse(rss_url)
+        # Send If-None-Match/If-Modified-Since so an unchanged feed comes back as a 304
+        state = load_feed_state()
+        feed = feedparser.parse(rss_url, etag=state.get("etag"), modified=state.get("modified"))
+    except Exception as e:
+        print(f"Error fetching news: {e}")
+        return {"news_text": f"Error fetching news: {e}", "link": "", "title": "", "date": ""}
+
+    return process_mit_feed(feed, max_articles)
+
+async def fetch_mit_feed_async(session, sem=None):
+    """Download and parse the MIT AI news RSS feed without blocking the event loop"""
+    if sem is None:
+        sem = asyncio.Semaphore(1)
+
+    async with sem:
+        print("Fetching RSS feed...")
+        state = load_feed_state()
+        headers = {}
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("modified"):
+            headers["If-Modified-Since"] = state["modified"]
+        async with session.get(rss_url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
+            body = await response.text()
+            status = response.status
+            etag = response.headers.get("ETag")
+            modified = response.headers.get("Last-Modified")
+
+    # Mirror the fields feedparser sets when it does the HTTP request itself
+    feed = feedparser.parse(body)
+    feed["status"] = status
+    if etag:
+        feed["etag"] = etag
+    if modified:
+        feed["modified"] = modified
+    return feed
+
+def process_mit_feed(feed, max_articles=5):
+    """Store new entries from an already parsed MIT AI news feed, avoiding duplicates"""
+    try:
+        if feed.get("status") == 304:
+            print("MIT AI News feed unchanged since last fetch")
+            return {"news_text": "", "link": "", "title": "", "date": ""}
 
         if not feed.entries:
             return {"news_text": "No news articles found", "link": "", "title": "", "date": ""}
@@ -266,14 +350,23 @@ def fetch_mit_news(max_articles=5):
         # Load existing articles if file exists
         existing_data = []
         existing_ids = set()
-        file_path = "../../data/mit_ai_news.json"
+        file_path = str(DATA_DIR / "mit_ai_news.json")
 
         if os.path.exists(file_path):
-            with open(file_path, "r", encoding="utf-8") as f:
-                existing_data = json.load(f)
-                existing_ids = {article.get("id") for article in existing_data if "id" in article}
+            with open(file_path, "rb") as f:
+                existing_data = orjson.loads(f.read())
+
+            for article in existing_data:
+                if "id" not in article:
+                    continue
+                # Re-key articles stored with the old 32-char MD5 IDs; the rewrite below persists them
+                if len(article["id"]) == 32:
+                    article["id"] = get_article_id(article)
+                existing_ids.add(article["id"])
 
         new_articles = []
+        skipped_count = 0
+        consecutive_known = 0
         print(f"Processing {min(len(feed.entries), max_articles)} articles...")
 
         for entry in feed.entries[:max_articles]:
@@ -281,8 +374,13 @@ def fetch_mit_news(max_articles=5):
 
             # Skip if already exists
             if article_id in existing_ids:
-                print(f"Skipping existing article: {entry.get('title', 'Unknown')}")
+                skipped_count += 1
+                consecutive_known += 1
+                # The feed is newest-first, so a run of known entries means the rest are known too
+                if consecutive_known >= MAX_CONSECUTIVE_KNOWN:
+                    break
                 continue
+            consecutive_known = 0
 
             # Extract content with fallback
             if hasattr(entry, 'content') and entry.content:
@@ -292,7 +390,7 @@ def fetch_mit_news(max_articles=5):
             else:
                 content = entry.get("description", "")
 
-            text_content = BeautifulSoup(content, "html.parser").get_text().strip()
+            text_content = BeautifulSoup(content, "lxml").get_text().strip()
             
             # Parse and validate date
             date_string = entry.get("published", "") or entry.get("updated", "")
@@ -313,24 +411,26 @@ def fetch_mit_news(max_articles=5):
             new_articles.append(new_article)
             print(f"New article added: {entry.get('title', 'Unknown')} (Week: {week_tag})")
 
+        if skipped_count:
+            print(f"Skipped {skipped_count} existing articles")
+
         # Merge old and new
         all_articles = existing_data + new_articles
 
         # Save updated file
-        os.makedirs("../../data", exist_ok=True)
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(all_articles, f, ensure_ascii=False, indent=4)
+        with open(file_path, "wb") as f:
+            f.write(orjson.dumps(all_articles, option=orjson.OPT_INDENT_2))
 
         print(f"Added {len(new_articles)} new articles")
 
+        # Only remember the validators once the entries have been stored
+        save_feed_state(feed)
+
         if not new_articles:
             # If no new articles, return the most recent existing article
             if existing_data:
-                # Sort by parsed date
-                sorted_articles = sorted(existing_data, 
-                                       key=lambda x: parse_article_date(x.get("date", "")) or datetime.min, 
-                                       reverse=True)
-                latest_article = sorted_articles[0]
+                # Pick the newest by parsed date; a full sort is not needed for one item
+                latest_article = max(existing_data, key=article_date_key)
                 return {
                     "title": latest_article.get("title", ""),
                     "news_text": latest_article.get("content", ""),
@@ -341,10 +441,7 @@ def fetch_mit_news(max_articles=5):
                 return {"news_text": "", "link": "", "title": "", "date": ""}
 
         # Return the latest *new* article for summarization
-        sorted_new = sorted(new_articles, 
-                          key=lambda x: parse_article_date(x.get("date", "")) or datetime.min, 
-                          reverse=True)
-        latest_article = sorted_new[0]
+        latest_article = max(new_articles, key=article_date_key)
         return {
             "title": latest_article.get("title", ""),
             "news_text": latest_article.get("content", ""),
@@ -362,16 +459,8 @@ def summarize_news(title, news_text, link, date, week_tag=None, save_to_file=Tru
     if not news_text.strip():
         return {"title": title, "summary": "No content available for summarization", "link": link, "date": date}
     
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", "You are a helpful summarizer of current AI trend news. Make a single-sentence summary of the provided news."),
-        ("human", "{news_text}"),
-    ])
-    
-    # Create chain with output parser
-    chain = prompt | llm | output_parser
-    
     try:
-        response = chain.invoke({"news_text": news_text})
+        response = _SUMMARY_CHAIN.invoke({"news_text": news_text})
         
         # Use provided week_tag or calculate from date
         if week_tag is None:
@@ -381,10 +470,9 @@ def summarize_news(title, news_text, link, date, week_tag=None, save_to_file=Tru
         summary = {"title": title, "summary": response, "link": link, "date": date, "week": week_tag}
     
         if save_to_file:
-            os.makedirs("../../data", exist_ok=True)
-            output_file = f"../../data/weekly_summary_{week_tag}.json"
-            with open(output_file, "w", encoding="utf-8") as f:
-                json.dump(summary, f, ensure_ascii=False, indent=4)
+            output_file = str(DATA_DIR / f"weekly_summary_{week_tag}.json")
+            with open(output_file, "wb") as f:
+                f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
             
         return summary
     except Exception as e:
@@ -395,7 +483,25 @@ def summarize_news(title, news_text, link, date, week_tag=None, save_to_file=Tru
         return {"title": title, "summary": f"Error generating summary: {e}", "link": link, "date": date, "week": week_tag}
 
 # ==================================================================== #
-def save_weekly_articles_with_summary(week_tag=None):
+def summarize_articles(articles, max_concurrency=8):
+    """Summarize a list of articles with one batched chain call.
+
+    The chain runs up to ``max_concurrency`` OpenAI requests at a time;
+    summaries are returned in the same order as ``articles``.
+    """
+    summaries = ["No content available for summarization"] * len(articles)
+    to_summarize = [i for i, article in enumerate(articles) if article.get("content", "").strip()]
+    if not to_summarize:
+        return summaries
+    
+    inputs = [{"news_text": articles[i]["content"]} for i in to_summarize]
+    results = _SUMMARY_CHAIN.batch(inputs, config={"max_concurrency": max_concurrency}, return_exceptions=True)
+    for i, result in zip(to_summarize, results):
+        summaries[i] = f"Error generating summary: {result}" if isinstance(result, Exception) else result
+    return summaries
+
+# ==================================================================== #
+def save_weekly_articles_with_summary(week_tag=None, max_concurrency=8):
     """Create a separate JSON for specified week's articles including AI summaries"""
     if week_tag is None:
         week_tag = get_week_tag()
@@ -411,26 +517,18 @@ def save_weekly_articles_with_summary(week_tag=None):
 
     weekly_articles = []
     
-    for article in weekly_articles_data:
-        print(f"Generating summary for: {article.get('title', 'Unknown')}")
-        
-        # Generate AI summary for the article, preserving existing week tag
-        summary_obj = summarize_news(
-            article.get("title", ""),
-            article.get("content", ""),
-            article.get("link", ""),
-            article.get("date", ""),
-            article.get("week"),  # Pass existing week tag
-            save_to_file=False
-        )
-
+    # Generate AI summaries for all articles in one batch
+    print(f"Generating summaries for {len(weekly_articles_data)} articles...")
+    summaries = summarize_articles(weekly_articles_data, max_concurrency)
+    
+    for article, summary in zip(weekly_articles_data, summaries):
         weekly_articles.append({
             "id": article.get("id"),
             "title": article.get("title"),
             "link": article.get("link"),
             "date": article.get("date"),
             "content": article.get("content"),
-            "summary": summary_obj.get("summary"),
+            "summary": summary,
             "week": week_tag
         })
 
@@ -447,7 +545,7 @@ def save_weekly_articles_with_summary(week_tag=None):
         start_of_week, end_of_week = get_week_start_end()
 
     # Unique file per week
-    output_file = f"../../data/week-{week_tag}.json"
+    output_file = str(DATA_DIR / f"week-{week_tag}.json")
 
     weekly_output = {
         "week": week_tag,
@@ -457,9 +555,8 @@ def save_weekly_articles_with_summary(week_tag=None):
         "articles": weekly_articles
     }
 
-    os.makedirs("../../data", exist_ok=True)
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(weekly_output, f, ensure_ascii=False, indent=4)
+    with open(output_file, "wb") as f:
+        f.write(orjson.dumps(weekly_output, option=orjson.OPT_INDENT_2))
 
     print(f"Weekly JSON with {len(weekly_articles)} articles and summaries saved to {output_file}")
 
@@ -527,11 +624,11 @@ def main():
     print("\nCreating weekly summary file...")
     
     # Find the most recent week with articles
-    file_path = "../../data/mit_ai_news.json"
+    file_path = str(DATA_DIR / "mit_ai_news.json")
     if os.path.exists(file_path):
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                articles = json.load(f)
+            with open(file_path, "rb") as f:
+                articles = orjson.loads(f.read())
             
             # Get all unique week tags and find the most recent one
             week_tags = set()
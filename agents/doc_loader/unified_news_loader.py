@@ -2,26 +2,50 @@
 Unified News Loader - Handles multiple news sources including MIT AI News and Techmeme
 """
 import os
-import json
+import gzip
+import orjson
 import sys
+import operator
+import threading
+import tempfile
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from pathlib import Path
+
+import aiohttp
+import ijson
+import markdown
 
 # Import individual loaders
 from news_loader import (
-    fetch_mit_news, 
-    
+    DATA_DIR,
+    fetch_mit_feed_async,
+    process_mit_feed,
     get_week_tag, 
     get_articles_for_week as get_mit_articles_for_week,
     save_weekly_articles_with_summary as save_mit_weekly_articles,
     tag_weekly_articles as tag_mit_weekly_articles
 )
 from techmeme_loader import (
-    fetch_techmeme_news,
+    fetch_techmeme_feed_async,
+    process_techmeme_feed,
     get_articles_for_week as get_techmeme_articles_for_week,
     save_weekly_articles_with_summary as save_techmeme_weekly_articles
 )
 
+# Reused for every summary instead of building a new Markdown pipeline per article
+_MD = markdown.Markdown()
+
+async def _fetch_all_feeds(max_concurrency=10):
+    """Download every configured RSS feed concurrently over a shared session"""
+    sem = asyncio.Semaphore(max_concurrency)
+    async with aiohttp.ClientSession() as session:
+        return await asyncio.gather(
+            fetch_mit_feed_async(session, sem),
+            fetch_techmeme_feed_async(session, sem),
+            return_exceptions=True
+        )
+
 def load_all_news_sources(max_articles_per_source=10):
     """Load news from all configured sources"""
     print("=" * 60)
@@ -31,10 +55,16 @@ def load_all_news_sources(max_articles_per_source=10):
     all_articles = []
     sources_summary = {}
     
-    # Fetch from MIT AI News
-    print("\n📰 Fetching MIT AI News...")
+    # Download all feeds at once; file writes happen afterwards, outside the event loop
+    print("\n📡 Downloading RSS feeds...")
+    mit_feed, techmeme_feed = asyncio.run(_fetch_all_feeds())
+    
+    # Process MIT AI News
+    print("\n📰 Processing MIT AI News...")
     try:
-        mit_data = fetch_mit_news(max_articles=max_articles_per_source)
+        if isinstance(mit_feed, Exception):
+            raise mit_feed
+        mit_data = process_mit_feed(mit_feed, max_articles=max_articles_per_source)
         if mit_data.get("news_text"):
             sources_summary["MIT AI News"] = "✅ Success"
         else:
@@ -43,10 +73,12 @@ def load_all_news_sources(max_articles_per_source=10):
         print(f"❌ Error fetching MIT AI News: {e}")
         sources_summary["MIT AI News"] = f"❌ Error: {e}"
     
-    # Fetch from Techmeme
-    print("\n📰 Fetching Techmeme News...")
+    # Process Techmeme
+    print("\n📰 Processing Techmeme News...")
     try:
-        techmeme_data = fetch_techmeme_news(max_articles=max_articles_per_source)
+        if isinstance(techmeme_feed, Exception):
+            raise techmeme_feed
+        techmeme_data = process_techmeme_feed(techmeme_feed, max_articles=max_articles_per_source)
         if techmeme_data.get("news_text"):
             sources_summary["Techmeme"] = "✅ Success"
         else:
@@ -64,6 +96,38 @@ def load_all_news_sources(max_articles_per_source=10):
     
     return sources_summary
 
+# mkstemp creates owner-only files; read the umask once (it can only be read by setting it)
+# so replaced files get the same mode a plain open() would give them
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def _replace_file(path, data, compress=False):
+    """Write data to a unique temp file next to path, then os.replace it into place"""
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if compress:
+                with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=6) as gz:
+                    gz.write(data)
+            else:
+                f.write(data)
+        os.chmod(tmp_file, 0o666 & ~_UMASK)
+        os.replace(tmp_file, path)
+    except BaseException:
+        os.remove(tmp_file)
+        raise
+
+def _write_combined(output_file, pretty_bytes, compact_bytes):
+    """Write the combined file and its gzipped copy, then report the result"""
+    try:
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        _replace_file(output_file, pretty_bytes)
+        # Compact gzipped copy for the web app, which reads it on every cache miss
+        _replace_file(output_file + ".gz", compact_bytes, compress=True)
+        print(f"  ✅ Combined weekly data saved: {output_file}")
+    except Exception as e:
+        print(f"  ❌ Error saving combined weekly data: {e}")
+
 def create_combined_weekly_data(week_tag=None):
     """Create a combined weekly JSON file with articles from all sources"""
     if week_tag is None:
@@ -99,26 +163,29 @@ def create_combined_weekly_data(week_tag=None):
         return
     
     # Generate summaries for articles that don't have them
-    from news_loader import summarize_news, parse_article_date
+    from news_loader import summarize_articles, parse_article_date
+    needs_summary = [article for article in all_articles if not article.get("summary")]
+    if needs_summary:
+        print(f"  📝 Generating summaries for {len(needs_summary)} articles...")
+        for article, summary in zip(needs_summary, summarize_articles(needs_summary)):
+            article["summary"] = summary
+    
     articles_with_summaries = []
+    sources_seen = set()
     
     for article in all_articles:
-        if not article.get("summary"):
-            print(f"  📝 Generating summary for: {article.get('title', 'Unknown')}")
-            summary_obj = summarize_news(
-                article.get("title", ""),
-                article.get("content", ""),
-                article.get("link", ""),
-                article.get("date", ""),
-                article.get("week"),
-                save_to_file=False
-            )
-            article["summary"] = summary_obj.get("summary", "")
+        sources_seen.add(article.get("source", "Unknown"))
+        # Render the Markdown once here so the web app does not redo it per request
+        article["summary_html"] = _MD.reset().convert(article.get("summary") or "")
+        # Parse the date once up front; the sort then only does C-level key lookups
+        article["_sort_dt"] = parse_article_date(article.get("date", "")) or datetime.min
         
         articles_with_summaries.append(article)
     
     # Sort all articles by date (newest first)
-    articles_with_summaries.sort(key=lambda x: parse_article_date(x.get("date", "")) or datetime.min, reverse=True)
+    articles_with_summaries.sort(key=operator.itemgetter("_sort_dt"), reverse=True)
+    for article in articles_with_summaries:
+        del article["_sort_dt"]
     
     # Create combined weekly structure
     from news_loader import get_week_start_end
@@ -129,23 +196,33 @@ def create_combined_weekly_data(week_tag=None):
         "start_of_week": start_of_week.isoformat(),
         "end_of_week": end_of_week.isoformat(),
         "article_count": len(articles_with_summaries),
-        "sources": list(set(article.get("source", "Unknown") for article in articles_with_summaries)),
+        "sources": sorted(sources_seen),
         "articles": articles_with_summaries
     }
     
     # Save combined file
-    output_file = f"../../data/combined-week-{week_tag}.json"
-    os.makedirs("../../data", exist_ok=True)
+    output_file = str(DATA_DIR / f"combined-week-{week_tag}.json")
     
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(combined_data, f, ensure_ascii=False, indent=4)
+    # Serialize now so later changes to combined_data can't race the writer, then write in the background;
+    # the writer reports success or failure once the files are in place
+    threading.Thread(
+        target=_write_combined,
+        args=(output_file, orjson.dumps(combined_data, option=orjson.OPT_INDENT_2), orjson.dumps(combined_data)),
+        daemon=False
+    ).start()
     
-    print(f"  ✅ Combined weekly data saved: {output_file}")
     print(f"  📊 Total articles: {len(articles_with_summaries)}")
     print(f"  📰 Sources: {', '.join(combined_data['sources'])}")
     
     return combined_data
 
+def _process_source_week(source_name, save_weekly, week_tag, max_concurrency):
+    """Write one source's weekly file; errors are reported here so other sources keep going"""
+    try:
+        save_weekly(week_tag, max_concurrency=max_concurrency)
+    except Exception as e:
+        print(f"  ❌ Error processing {source_name}: {e}")
+
 def process_all_sources_for_week(week_tag=None):
     """Process all sources and create individual weekly files plus combined file"""
     if week_tag is None:
@@ -153,19 +230,16 @@ def process_all_sources_for_week(week_tag=None):
     
     print(f"\n🔄 Processing all sources for week {week_tag}...")
     
-    # Process MIT AI News
-    print("\n📰 Processing MIT AI News...")
-    try:
-        save_mit_weekly_articles(week_tag)
-    except Exception as e:
-        print(f"  ❌ Error processing MIT AI News: {e}")
-    
-    # Process Techmeme
-    print("\n📰 Processing Techmeme...")
-    try:
-        save_techmeme_weekly_articles(week_tag)
-    except Exception as e:
-        print(f"  ❌ Error processing Techmeme: {e}")
+    # Both sources spend their time waiting on the OpenAI API, so process them side by side,
+    # each with half of the usual request budget so at most 8 calls are in flight overall
+    print("\n📰 Processing MIT AI News and Techmeme...")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(_process_source_week, "MIT AI News", save_mit_weekly_articles, week_tag, 4),
+            executor.submit(_process_source_week, "Techmeme", save_techmeme_weekly_articles, week_tag, 4),
+        ]
+        for future in as_completed(futures):
+            future.result()
     
     # Create combined file
     print("\n🔄 Creating combined weekly file...")
@@ -178,7 +252,7 @@ def list_available_weeks():
     """List all available weeks across all sources"""
     print("\n📅 Available weeks across all sources:")
     
-    data_dir = Path("../../data")
+    data_dir = DATA_DIR
     if not data_dir.exists():
         print("  ❌ Data directory not found")
         return
@@ -190,17 +264,21 @@ def list_available_weeks():
         "Combined": []
     }
     
-    for file_path in data_dir.glob("week-*.json"):
-        week_tag = file_path.stem.replace("week-", "")
-        weekly_files["MIT AI News"].append((week_tag, file_path))
-    
-    for file_path in data_dir.glob("techmeme-week-*.json"):
-        week_tag = file_path.stem.replace("techmeme-week-", "")
-        weekly_files["Techmeme"].append((week_tag, file_path))
-    
-    for file_path in data_dir.glob("combined-week-*.json"):
-        week_tag = file_path.stem.replace("combined-week-", "")
-        weekly_files["Combined"].append((week_tag, file_path))
+    # One directory pass, bucketed by filename prefix
+    prefixes = (
+        ("combined-week-", "Combined"),
+        ("techmeme-week-", "Techmeme"),
+        ("week-", "MIT AI News"),
+    )
+    with os.scandir(data_dir) as it:
+        for entry in it:
+            name = entry.name
+            if not name.endswith(".json"):
+                continue
+            for prefix, source in prefixes:
+                if name.startswith(prefix):
+                    weekly_files[source].append((name[len(prefix):-len(".json")], entry.path))
+                    break
     
     # Display results
     for source, files in weekly_files.items():
@@ -208,9 +286,9 @@ def list_available_weeks():
             print(f"\n  📰 {source}:")
             for week_tag, file_path in sorted(files, reverse=True):
                 try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                        article_count = len(data.get("articles", []))
+                    # Stream-count the articles array instead of decoding the whole file
+                    with open(file_path, "rb") as f:
+                        article_count = sum(1 for _ in ijson.items(f, "articles.item", use_float=True))
                         print(f"    {week_tag}: {article_count} articles")
                 except Exception as e:
                     print(f"    {week_tag}: Error reading file ({e})")
@@ -1,13 +1,19 @@
 import os
-import json
+import re
+import gzip
+import time
+import functools
+import threading
+from collections import Counter, defaultdict
+import orjson
 from flask import Flask, render_template, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from dotenv import load_dotenv
 from agents.chat_bot.chat import chain_with_history
 from agents.reporter.report_bot import generate_weekly_summary
 from agents.doc_loader.news_loader import get_week_tag
-from rag.embedding import vector_store, distance_to_confidence, initialize_vector_store
+from rag.embedding import get_vector_store, cached_similarity_search, distance_to_confidence, initialize_vector_store
 import uuid
-from pathlib import Path
 import markdown
 
 load_dotenv()
@@ -17,10 +23,22 @@ if not os.environ.get('OPENAI_API_KEY'):
     print("⚠️ Warning: OPENAI_API_KEY not found in environment variables")
     print("AI functionality (chat and summary) will not work without this key")
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes with orjson."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # Initialize vector store on startup
+vector_store = None
 try:
+    vector_store = get_vector_store()
     initialize_vector_store()
     print("✅ Vector store initialized successfully")
 except Exception as e:
@@ -30,6 +48,99 @@ except Exception as e:
 # ----------------------
 # Load news data function
 # ----------------------
+# One Markdown pipeline reused across conversions; it keeps state, so converts are serialized
+_MD = markdown.Markdown()
+_MD_LOCK = threading.Lock()
+
+def _render_markdown(text):
+    """Convert Markdown to HTML with the shared converter."""
+    with _MD_LOCK:
+        return _MD.reset().convert(text)
+
+@functools.lru_cache(maxsize=32)
+def _load_parsed(path, mtime_ns):
+    """Parse a news JSON file and convert its Markdown summaries to HTML.
+
+    ``mtime_ns`` is only part of the cache key: editing the file changes it,
+    so a rewritten file is parsed again instead of being served stale.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, 'rb') as f:
+        data = orjson.loads(f.read())
+
+    # Ensure data is a dict
+    if isinstance(data, list):
+        data = {"articles": data}
+
+    # Convert Markdown to HTML and add safe defaults
+    for article in data.get("articles", []):
+        # Combined files are written with summary_html already; older files still need converting
+        if "summary_html" not in article:
+            summary_md = article.get("summary") or ""
+            try:
+                article["summary_html"] = _render_markdown(summary_md)
+            except Exception:
+                article["summary_html"] = summary_md
+
+        article["title"] = article.get("title") or "No Title"
+        article["link"] = article.get("link") or "#"
+        article["date"] = article.get("date") or ""
+        article["source"] = article.get("source") or "Unknown"
+
+    return data
+
+def _load_file(path):
+    """Load a news JSON file through the mtime-keyed cache."""
+    path = str(path)
+    return _load_parsed(path, os.stat(path).st_mtime_ns)
+
+_TOKEN_RE = re.compile(r"\w+")
+
+@functools.lru_cache(maxsize=32)
+def _load_index(path, mtime_ns):
+    """Build a token -> article positions index for keyword search.
+
+    Shares the ``(path, mtime_ns)`` key with ``_load_parsed`` so the index is
+    only rebuilt when the underlying file changes.
+    """
+    index = defaultdict(set)
+    for i, article in enumerate(_load_parsed(path, mtime_ns).get("articles", [])):
+        text = f"{article['title']} {article.get('summary') or ''}".lower()
+        for token in _TOKEN_RE.findall(text):
+            index[token].add(i)
+    return index
+
+# Weekly filename prefixes and the source bucket each one belongs to
+WEEKLY_FILE_PREFIXES = (
+    ("combined-week-", "combined"),
+    ("techmeme-week-", "techmeme"),
+    ("week-", "mit"),
+)
+
+def _scan_weekly_files(data_dir="data"):
+    """Bucket weekly files by source in a single directory pass."""
+    buckets = {"combined": {}, "techmeme": {}, "mit": {}}
+    try:
+        with os.scandir(data_dir) as it:
+            for entry in it:
+                name = entry.name
+                if name.endswith(".json.gz"):
+                    stem = name[:-len(".json.gz")]
+                elif name.endswith(".json"):
+                    stem = name[:-len(".json")]
+                else:
+                    continue
+                for prefix, source in WEEKLY_FILE_PREFIXES:
+                    if name.startswith(prefix):
+                        week_name = stem[len(prefix):]
+                        # Prefer the gzipped copy when both exist
+                        if name.endswith(".gz") or week_name not in buckets[source]:
+                            buckets[source][week_name] = entry.path
+                        break
+    except FileNotFoundError:
+        pass
+    return buckets
+
 def load_news_data(week_tag=None):
     """Load news data from JSON files and convert Markdown summaries to HTML."""
     try:
@@ -37,37 +148,34 @@ def load_news_data(week_tag=None):
 
         # Try combined weekly file first (includes all sources)
         if week_tag:
-            combined_file = f"data/combined-week-{week_tag}.json"
+            combined_file = f"data/combined-week-{week_tag}.json.gz"
+            if not os.path.exists(combined_file):
+                combined_file = f"data/combined-week-{week_tag}.json"
             if os.path.exists(combined_file):
-                with open(combined_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    print(f"📰 Loaded combined weekly data for {week_tag}")
+                data = _load_file(combined_file)
+                print(f"📰 Loaded combined weekly data for {week_tag}")
             else:
                 # Fallback to individual weekly files
                 weekly_file = f"data/week-{week_tag}.json"
                 if os.path.exists(weekly_file):
-                    with open(weekly_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        print(f"📰 Loaded individual weekly data for {week_tag}")
+                    data = _load_file(weekly_file)
+                    print(f"📰 Loaded individual weekly data for {week_tag}")
                 else:
                     print(f"⚠️ Data file not found for week {week_tag}, falling back to available data")
 
         # Fallback to most recent available week or general news
         if not data:
             # First, try to find the most recent available week
-            data_dir = Path("data")
+            weekly_files = _scan_weekly_files()
             available_weeks = []
+            seen = set()
             
-            # Look for combined weekly files
-            for file_path in data_dir.glob("combined-week-*.json"):
-                week_name = file_path.stem.replace("combined-week-", "")
-                available_weeks.append((week_name, file_path))
-            
-            # Look for individual weekly files
-            for file_path in data_dir.glob("week-*.json"):
-                week_name = file_path.stem.replace("week-", "")
-                if not any(w[0] == week_name for w in available_weeks):
-                    available_weeks.append((week_name, file_path))
+            # Combined weekly files first, then individual MIT weekly files
+            for source in ("combined", "mit"):
+                for week_name, file_path in weekly_files[source].items():
+                    if week_name not in seen:
+                        available_weeks.append((week_name, file_path))
+                        seen.add(week_name)
             
             # Sort by week name (newest first)
             available_weeks.sort(key=lambda x: x[0], reverse=True)
@@ -75,35 +183,15 @@ def load_news_data(week_tag=None):
             if available_weeks:
                 # Use the most recent available week
                 latest_week, latest_file = available_weeks[0]
-                with open(latest_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    print(f"📰 Loaded most recent available weekly data: {latest_week}")
+                data = _load_file(latest_file)
+                print(f"📰 Loaded most recent available weekly data: {latest_week}")
             else:
                 # Final fallback to general news
-                with open('data/mit_ai_news.json', 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    print("📰 Loaded general MIT AI news data")
+                data = _load_file('data/mit_ai_news.json')
+                print("📰 Loaded general MIT AI news data")
 
-        # Ensure data is a dict
-        if isinstance(data, list):
-            data = {"articles": data, "week": week_tag or "all"}
-        else:
-            data["week"] = data.get("week") or week_tag or "all"
-
-        # Convert Markdown to HTML and add safe defaults
-        for article in data.get("articles", []):
-            summary_md = article.get("summary") or ""
-            try:
-                article["summary_html"] = markdown.markdown(summary_md)
-            except Exception:
-                article["summary_html"] = summary_md
-
-            article["title"] = article.get("title") or "No Title"
-            article["link"] = article.get("link") or "#"
-            article["date"] = article.get("date") or ""
-            article["source"] = article.get("source") or "Unknown"
-
-        return data
+        # The parsed file is shared through the cache, so return a copy carrying this request's week
+        return {**data, "week": data.get("week") or week_tag or "all"}
 
     except Exception as e:
         print(f"Error loading news data: {e}")
@@ -112,92 +200,143 @@ def load_news_data(week_tag=None):
 # ----------------------
 # Available weeks
 # ----------------------
+# Directory listing is cached briefly since it runs on every page render
+WEEKS_CACHE_TTL = 60
+_weeks_cache = {"expires_at": 0.0, "weeks": []}
+
 def get_available_weeks():
+    now = time.monotonic()
+    if now < _weeks_cache["expires_at"]:
+        return _weeks_cache["weeks"]
+
     weeks = []
-    data_dir = Path("data")
+    seen = set()
+    weekly_files = _scan_weekly_files()
 
     # General news
-    if (data_dir / "mit_ai_news.json").exists():
+    if os.path.exists("data/mit_ai_news.json"):
         weeks.append({"value": "all", "label": "All Articles"})
 
-    # Combined weekly files (preferred - includes all sources)
-    for file_path in data_dir.glob("combined-week-*.json"):
-        week_name = file_path.stem.replace("combined-week-", "")
-        weeks.append({"value": week_name, "label": f"Week {week_name} (All Sources)"})
-
-    # Individual weekly files (fallback)
-    for file_path in data_dir.glob("week-*.json"):
-        week_name = file_path.stem.replace("week-", "")
-        # Only add if not already in combined files
-        if not any(w["value"] == week_name for w in weeks):
-            weeks.append({"value": week_name, "label": f"Week {week_name} (MIT)"})
-
-    # Techmeme weekly files (fallback)
-    for file_path in data_dir.glob("techmeme-week-*.json"):
-        week_name = file_path.stem.replace("techmeme-week-", "")
-        # Only add if not already in combined files
-        if not any(w["value"] == week_name for w in weeks):
-            weeks.append({"value": week_name, "label": f"Week {week_name} (Techmeme)"})
+    # Combined weekly files are preferred (all sources), then MIT and Techmeme as fallbacks
+    for source, label in (("combined", "All Sources"), ("mit", "MIT"), ("techmeme", "Techmeme")):
+        for week_name in weekly_files[source]:
+            if week_name not in seen:
+                weeks.append({"value": week_name, "label": f"Week {week_name} ({label})"})
+                seen.add(week_name)
 
     weeks.sort(key=lambda x: x["value"], reverse=True)
+    _weeks_cache["weeks"] = weeks
+    _weeks_cache["expires_at"] = now + WEEKS_CACHE_TTL
     return weeks
 
 # ----------------------
 # Search articles
 # ----------------------
-def search_articles(query, week_filter=None, limit=10):
-    try:
-        if not vector_store:
-            return []
+def _keyword_search(query, week_filter=None, limit=10):
+    """Rank articles by query-token overlap when no vector store is available."""
+    if week_filter and week_filter != "all":
+        candidates = [
+            f"data/combined-week-{week_filter}.json.gz",
+            f"data/combined-week-{week_filter}.json",
+            f"data/week-{week_filter}.json",
+        ]
+    else:
+        candidates = ["data/mit_ai_news.json"]
+    path = next((p for p in candidates if os.path.exists(p)), None)
+    if not path:
+        return []
 
-        docs_scores = vector_store.similarity_search_with_score(query, k=limit*2)
-        threshold = 0.001
-        filtered_results = []
+    mtime_ns = os.stat(path).st_mtime_ns
+    articles = _load_parsed(path, mtime_ns).get("articles", [])
+    index = _load_index(path, mtime_ns)
 
-        unique_links = set()  # Track links we've already added
+    query_tokens = set(_TOKEN_RE.findall(query.lower()))
+    if not query_tokens:
+        return []
 
-        for doc, score in docs_scores:
-            confidence = distance_to_confidence(score)
-            if confidence < threshold:
-                continue
+    overlap = Counter()
+    for token in query_tokens:
+        overlap.update(index.get(token, ()))
+
+    results = []
+    unique_links = set()
+    for i, count in overlap.most_common():
+        article = articles[i]
+        if article["link"] in unique_links:
+            continue
+        unique_links.add(article["link"])
+
+        results.append({
+            "title": article["title"],
+            "summary": article.get("summary") or "Unknown",
+            "link": article["link"],
+            "source": article["source"],
+            "confidence": round(count / len(query_tokens), 3)
+        })
+        if len(results) >= limit:
+            break
 
-            try:
-                parts = {}
-                for item in doc.page_content.split(" | "):
-                    if ": " in item:
-                        key, value = item.split(": ", 1)
-                        parts[key] = value
+    return results
+
+def search_articles(query, week_filter=None, limit=10):
+    try:
+        if not vector_store:
+            return _keyword_search(query, week_filter, limit)
 
-                link = parts.get("link", "#")
+        threshold = 0.001
+        filtered_results = {}  # link -> result; the first (best-scoring) hit per link wins
+
+        # Ask for just enough results first, and only widen when dedupe/filtering leaves too few
+        for k in (limit, limit * 4):
+            docs_scores = cached_similarity_search(query, k=k)
+            exhausted = len(docs_scores) < k
+
+            for doc, score in docs_scores:
+                confidence = distance_to_confidence(score)
+                # Results come back best-first, so nothing after this clears the threshold
+                if confidence < threshold:
+                    exhausted = True
+                    break
 
-                # Skip duplicates
-                if link in unique_links:
+                # Skip duplicates and other weeks before doing any parsing
+                link = doc.metadata.get("link", "#")
+                if link in filtered_results:
                     continue
-                unique_links.add(link)
-
-                # Filter by week
                 if week_filter and week_filter != "all":
-                    doc_week = doc.metadata.get("week", "")
-                    if doc_week != week_filter:
+                    if doc.metadata.get("week", "") != week_filter:
                         continue
 
-                filtered_results.append({
-                    "title": parts.get("title", "Unknown"),
-                    "summary": parts.get("summary", "Unknown"),
-                    "link": link,
-                    "source": parts.get("source", "Unknown"),
-                    "confidence": round(confidence, 3)
-                })
+                try:
+                    # Documents indexed with the full metadata skip parsing page_content
+                    if "summary" in doc.metadata:
+                        parts = doc.metadata
+                    else:
+                        parts = {}
+                        for item in doc.page_content.split(" | "):
+                            if ": " in item:
+                                key, value = item.split(": ", 1)
+                                parts[key] = value
+
+                    filtered_results[link] = {
+                        "title": parts.get("title", "Unknown"),
+                        "summary": parts.get("summary", "Unknown"),
+                        "link": link,
+                        "source": parts.get("source", "Unknown"),
+                        "confidence": round(confidence, 3)
+                    }
+
+                except Exception as e:
+                    print(f"Error parsing document: {e}")
+                    continue
 
                 # Stop early if we have enough results
                 if len(filtered_results) >= limit:
                     break
 
-            except Exception as e:
-                print(f"Error parsing document: {e}")
-                continue
+            if exhausted or len(filtered_results) >= limit:
+                break
 
-        return filtered_results
+        return list(filtered_results.values())
 
     except Exception as e:
         print(f"Error searching articles: {e}")
@@ -268,6 +407,30 @@ def api_health():
         "vector_store_available": vector_store is not None
     })
 
+def _build_all_context(news_data):
+    """Format every article of the loaded week as chat context."""
+    if not news_data.get("articles"):
+        return ""
+    context_parts = [f"Here are the AI news articles for week {news_data['week']}:\n\n"]
+    for article in news_data["articles"]:
+        source = article.get('source', 'Unknown')
+        context_parts.append(f"Title: {article['title']}\nSource: {source}\nLink: {article['link']}\nSummary: {article.get('summary', '')}\n\n")
+    return "".join(context_parts)
+
+def _build_search_context(message, week_tag, actual_week):
+    """Format the articles matching the chat message as context."""
+    search_results = search_articles(query=message, week_filter=week_tag, limit=5)
+    if not search_results:
+        return f"I looked at the latest AI news (week {actual_week}) but couldn't find any articles matching your query.\n\n"
+    context_parts = [f"Based on the latest AI news (week {actual_week}), here are some relevant articles:\n\n"]
+    for article in search_results:
+        source = article.get('source', 'Unknown')
+        context_parts.append(f"Title: {article['title']}\nSource: {source}\nLink: {article['link']}\nSummary: {article['summary']}\n\n")
+    return "".join(context_parts)
+
+# Phrases that mean the user wants matching articles rather than a general answer
+_SEARCH_RE = re.compile(r"\b(search|find|show articles|get articles|latest news)\b", re.IGNORECASE)
+
 @app.route('/api/chat', methods=['POST'])
 def api_chat():
     try:
@@ -279,48 +442,40 @@ def api_chat():
             return jsonify({"error": "No message provided"}), 400
 
         # --- Step 1: Detect if user wants article info ---
-        search_keywords = ["search", "find", "show articles", "get articles", "latest news"]
-        wants_search = any(word in message.lower() for word in search_keywords)
+        wants_search = bool(_SEARCH_RE.search(message))
 
-        # --- Step 2: Load latest week's news JSON for context ---
+        # --- Step 2: Work out which week's news the chat refers to ---
+        latest_week_tag = get_week_tag()
+        news_data = None
+        actual_week = latest_week_tag
         try:
-            latest_week_tag = get_week_tag()
             news_data = load_news_data(week_tag=latest_week_tag)
-            context_text = ""
-            if news_data.get("articles"):
-                actual_week = news_data.get("week", latest_week_tag)
-                context_text = f"Here are the AI news articles for week {actual_week}:\n\n"
-                for article in news_data["articles"]:
-                    source = article.get('source', 'Unknown')
-                    context_text += f"Title: {article['title']}\nSource: {source}\nLink: {article['link']}\nSummary: {article.get('summary', '')}\n\n"
+            actual_week = news_data.get("week", latest_week_tag)
         except Exception as e:
             print(f"⚠️ Error loading news data: {e}")
-            context_text = "I'm having trouble loading the latest news data, but I can still help answer your questions.\n\n"
 
-        # --- Step 3: If user explicitly wants search, filter by query ---
+        # --- Step 3: If user explicitly wants search, only the matching articles become context ---
+        context_text = None
+        search_failed = False
         if wants_search and vector_store:
             try:
-                search_results = search_articles(query=message, week_filter=latest_week_tag, limit=5)
-                if search_results:
-                    actual_week = news_data.get("week", latest_week_tag) if 'news_data' in locals() else latest_week_tag
-                    context_text = f"Based on the latest AI news (week {actual_week}), here are some relevant articles:\n\n"
-                    for article in search_results:
-                        source = article.get('source', 'Unknown')
-                        context_text += f"Title: {article['title']}\nSource: {source}\nLink: {article['link']}\nSummary: {article['summary']}\n\n"
-                else:
-                    actual_week = news_data.get("week", latest_week_tag) if 'news_data' in locals() else latest_week_tag
-                    context_text = f"I looked at the latest AI news (week {actual_week}) but couldn't find any articles matching your query.\n\n"
+                context_text = _build_search_context(message, latest_week_tag, actual_week)
             except Exception as e:
                 print(f"⚠️ Error in search functionality: {e}")
+                search_failed = True
+
+        # Otherwise (or if search failed) use the whole week's articles
+        if context_text is None:
+            if news_data is not None:
+                context_text = _build_all_context(news_data)
+            else:
+                context_text = "I'm having trouble loading the latest news data, but I can still help answer your questions.\n\n"
+            if search_failed:
                 context_text += "I'm having trouble searching through the news articles right now.\n\n"
 
         # --- Step 4: Include a note in general response ---
         if not wants_search:
-            try:
-                actual_week = news_data.get("week", latest_week_tag) if 'news_data' in locals() else latest_week_tag
-                context_text += f"Note: The AI news articles referenced here are from week {actual_week}.\n\n"
-            except:
-                context_text += f"Note: The AI news articles referenced here are from the latest available week.\n\n"
+            context_text += f"Note: The AI news articles referenced here are from week {actual_week}.\n\n"
 
         # --- Step 5: Call the LLM chain ---
         llm_input = {
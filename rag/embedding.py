@@ -1,6 +1,20 @@
 from pathlib import Path
 import os
 import json
+import orjson
+import ijson
+import itertools
+import functools
+import logging
+import threading
+from collections import OrderedDict
+import hashlib
+import sqlite3
+from array import array
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+import numpy as np
 from dotenv import load_dotenv
 from langchain.schema import Document
 from langchain_huggingface.embeddings import HuggingFaceEmbeddings
@@ -11,66 +25,257 @@ import shutil
 
 load_dotenv()
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
+
+# Per-article detail goes to debug logging; stdout only gets per-file summaries
+logger = logging.getLogger(__name__)
     
 # Initialize embeddings
-model_name = "sentence-transformers/all-mpnet-base-v2"  
-embeddings = HuggingFaceEmbeddings(model_name=model_name)
+# MiniLM (22M params, 384-dim) encodes several times faster than MPNet and is plenty for headline + summary search
+model_name = "sentence-transformers/all-MiniLM-L6-v2"
+@functools.lru_cache(maxsize=None)
+def embedding_device():
+    """Encode on the GPU when there is one; EMBEDDING_DEVICE overrides the choice"""
+    import torch
+    return os.environ.get("EMBEDDING_DEVICE") or ("cuda" if torch.cuda.is_available() else "cpu")
+
+def use_fp16():
+    """GPU encodes run in half precision; CPU stays FP32"""
+    return embedding_device().startswith("cuda")
+
+@functools.lru_cache(maxsize=None)
+def get_embeddings():
+    """Load the sentence-transformer; deferred until something actually embeds text"""
+    import torch
+    model_kwargs = {"device": embedding_device()}
+    if use_fp16():
+        model_kwargs["model_kwargs"] = {"torch_dtype": torch.float16}
+        torch.backends.cuda.matmul.allow_tf32 = True
+
+    # Unit-length vectors make the cosine distance the collection uses a plain dot product
+    return HuggingFaceEmbeddings(
+        model_name=model_name,
+        model_kwargs=model_kwargs,
+        encode_kwargs={"normalize_embeddings": True, "batch_size": 256 if use_fp16() else 32},
+    )
+
+class _LazyEmbeddings:
+    """Stands in for the embeddings object and loads the model on the first method call"""
+
+    def __getattr__(self, name):
+        return getattr(get_embeddings(), name)
+
+# Importing this module (e.g. for load_all_articles or get_week_tag) does not load the model
+embeddings = _LazyEmbeddings()
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+# Create or load vector store on first use, so importing this module doesn't open the store
+PERSIST_DIRECTORY = "./chroma_langchain_db"
+# One collection per model: vectors of different models (and dimensions) can't share an index
+COLLECTION_NAME = f"news-{model_name.rsplit('/', 1)[-1]}"
+
+@functools.lru_cache(maxsize=None)
+def get_vector_store():
+    """Return the shared Chroma vector store"""
+    return Chroma(
+        collection_name=COLLECTION_NAME,
+        embedding_function=embeddings,
+        persist_directory=PERSIST_DIRECTORY,
+        collection_metadata={
+            # Chroma defaults to L2; distance_to_confidence assumes cosine distance
+            "hnsw:space": "cosine",
+            # Sized for a news corpus of ~10^4-10^5 vectors: sparser graph, cheaper inserts
+            "hnsw:M": 8,
+            "hnsw:construction_ef": 64,
+            # Query-time breadth stays above the default to keep recall up with the smaller M
+            "hnsw:search_ef": 32,
+            # Buffer inserts and flush the index in larger steps instead of per add
+            "hnsw:batch_size": 500,
+            "hnsw:sync_threshold": 2000,
+        },
+    )
+
+# Links already embedded, kept next to the store so dedup doesn't have to read every metadata row
+SEEN_LINKS_FILE = os.path.join(PERSIST_DIRECTORY, f"seen_links-{COLLECTION_NAME}.json")
+_seen_links = None
+
+def get_seen_links():
+    """Return the set of embedded links, loading it from disk on first use"""
+    global _seen_links
+    if _seen_links is not None:
+        return _seen_links
+
+    try:
+        with open(SEEN_LINKS_FILE, "r", encoding="utf-8") as f:
+            _seen_links = set(json.load(f))
+        return _seen_links
+    except FileNotFoundError:
+        pass
+
+    # No links file yet: seed it once from the existing collection
+    existing_metadatas = get_vector_store()._collection.get(include=["metadatas"])["metadatas"] or []
+    _seen_links = {meta["link"] for meta in existing_metadatas if meta and meta.get("link")}
+    save_seen_links()
+    return _seen_links
+
+def save_seen_links():
+    """Persist the embedded-links set"""
+    os.makedirs(PERSIST_DIRECTORY, exist_ok=True)
+    with open(SEEN_LINKS_FILE, "w", encoding="utf-8") as f:
+        json.dump(sorted(get_seen_links()), f)
+
+# Text that gets embedded, filled straight from a document's metadata dict
+_CONTENT_TMPL = "title: {title} | summary: {summary} | link: {link} | source: {source}".format_map
+
+# Chroma commits each add as one transaction plus an index update, so adds are grouped into large batches
+ADD_BATCH_SIZE = 5000
+
+# Documents queued by news_embedding until flush() adds them in one go
+_pending_docs = []
+
+def _batched(iterable, size=ADD_BATCH_SIZE):
+    """Yield lists of up to ``size`` items from ``iterable``"""
+    it = iter(iterable)
+    while batch := list(itertools.islice(it, size)):
+        yield batch
 
-# Create or load vector store
-vector_store = Chroma(
-    collection_name="example_collection",
-    embedding_function=embeddings,
-    persist_directory="./chroma_langchain_db",
-)
+# Vectors keyed by sha256(model + encode settings + text), so unchanged articles skip the model on re-runs
+EMBEDDING_CACHE_FILE = os.path.join(PERSIST_DIRECTORY, "embedding_cache.sqlite3")
+
+def cached_embed(texts):
+    """Embed texts, reusing cached vectors and encoding only the misses"""
+    cache_key = f"{model_name}:normalized:{'fp16' if use_fp16() else 'fp32'}"
+    keys = [hashlib.sha256(f"{cache_key}\n{text}".encode("utf-8")).digest() for text in texts]
+    vectors = {}
+
+    os.makedirs(PERSIST_DIRECTORY, exist_ok=True)
+    with closing(sqlite3.connect(EMBEDDING_CACHE_FILE)) as conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+
+        # Look keys up in chunks to stay under SQLite's bound-parameter limit
+        for chunk in _batched(set(keys), 500):
+            placeholders = ",".join("?" * len(chunk))
+            for key, blob in conn.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk):
+                vector = array("f")
+                vector.frombytes(blob)
+                vectors[key] = vector.tolist()
+
+        # Uncached keys mapped to their first index, so a text repeated in one call is encoded and stored once
+        missing = {}
+        for i, key in enumerate(keys):
+            if key not in vectors:
+                missing.setdefault(key, i)
+        if missing:
+            order = list(missing)
+            new_vectors = embeddings.embed_documents([texts[missing[key]] for key in order])
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, array("f", vector).tobytes()) for key, vector in zip(order, new_vectors)],
+                )
+            vectors.update(zip(order, new_vectors))
+
+    print(f"Embedded {len(missing)} texts ({len(texts) - len(missing)} from cache or repeats).")
+    return [vectors[key] for key in keys]
+
+def _add_batch(docs):
+    """Embed a batch with one encode call and write it straight to the Chroma collection"""
+    texts = [doc.page_content for doc in docs]
+    get_vector_store()._collection.add(
+        ids=[uuid4().hex for _ in texts],
+        embeddings=cached_embed(texts),
+        documents=texts,
+        metadatas=[doc.metadata for doc in docs],
+    )
+    get_seen_links().update(doc.metadata["link"] for doc in docs)
+    save_seen_links()
+    _clear_semantic_cache()
+
+# Recent query vectors with their results; a close enough query reuses them instead of probing the index
+SEMANTIC_CACHE_SIZE = 256
+SEMANTIC_CACHE_THRESHOLD = 0.87
+_semantic_cache = OrderedDict()  # query -> (unit vector, k, results)
+_semantic_cache_lock = threading.Lock()
+
+def cached_similarity_search(query, k=4):
+    """similarity_search_with_score behind an LRU cache matched on query-embedding cosine similarity"""
+    # Embeddings are normalized, so a dot product is the cosine similarity
+    query_vector = np.asarray(embeddings.embed_query(query), dtype=np.float32)
+
+    with _semantic_cache_lock:
+        best_key, best_similarity = None, SEMANTIC_CACHE_THRESHOLD
+        for key, (vector, cached_k, _) in _semantic_cache.items():
+            if cached_k < k:
+                continue
+            similarity = float(vector @ query_vector)
+            if similarity >= best_similarity:
+                best_key, best_similarity = key, similarity
+        if best_key is not None:
+            _semantic_cache.move_to_end(best_key)
+            return _semantic_cache[best_key][2][:k]
+
+    results = get_vector_store().similarity_search_by_vector_with_relevance_scores(query_vector.tolist(), k=k)
+
+    with _semantic_cache_lock:
+        _semantic_cache[query] = (query_vector, k, results)
+        _semantic_cache.move_to_end(query)
+        while len(_semantic_cache) > SEMANTIC_CACHE_SIZE:
+            _semantic_cache.popitem(last=False)
+    return results
+
+def _clear_semantic_cache():
+    """Drop cached search results once the store's contents change"""
+    with _semantic_cache_lock:
+        _semantic_cache.clear()
 
 def news_embedding(data_file, week_tag=None):
+    """Queue a weekly file's new articles for embedding; call flush() after the last file"""
     if not data_file.exists():
         raise FileNotFoundError(f"Data file not found: {data_file}")
 
-    with open(data_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = orjson.loads(data_file.read_bytes())
 
     # Extract week tag from filename if not provided
     if week_tag is None:
         week_tag = data_file.stem.replace("week-", "").replace("combined-week-", "")
 
-    # Get all existing links in the vector store
-    # Use metadata 'link' to detect duplicates
-    existing_links = set()
-    try:
-        # Chroma stores metadata in _collection internally
-        existing_metadatas = vector_store._collection.get()["metadatas"]
-        for meta in existing_metadatas:
-            if meta and meta.get("link"):  # Added None check
-                existing_links.add(meta["link"])
-    except Exception:
-        pass  # First run, nothing exists yet
+    # Links already in the vector store, plus ones queued from earlier files
+    existing_links = get_seen_links() | {doc.metadata["link"] for doc in _pending_docs}
 
     docs_to_add = []
+    skip_count = 0
     for item in data.get("articles", []):
-        source = item.get('source', 'Unknown')
-        content = f"title: {item['title']} | summary: {item['summary']} | link: {item['link']} | source: {source}"
         if item['link'] in existing_links:
-            print(f"Already exists: {item['title']}")
+            skip_count += 1
+            logger.debug("Already exists: %s", item['title'])
         else:
-            print(f"New: {item['title']}")
-            docs_to_add.append(Document(
-                page_content=content,
-                metadata={
-                    "link": item['link'],
-                    "week": week_tag,
-                    "title": item['title'],
-                    "source": source
-                }
-            ))
-
-    if docs_to_add:
-        vector_store.add_documents(docs_to_add)
-        print(f"Added {len(docs_to_add)} new documents to vector store.")
-    else:
+            logger.debug("New: %s", item['title'])
+            metadata = {
+                "link": item['link'],
+                "week": week_tag,
+                "title": item['title'],
+                "summary": item['summary'],
+                "source": item.get('source', 'Unknown')
+            }
+            docs_to_add.append(Document(page_content=_CONTENT_TMPL(metadata), metadata=metadata))
+
+    _pending_docs.extend(docs_to_add)
+    print(f"Queued {len(docs_to_add)} new; skipped {skip_count} duplicates ({len(_pending_docs)} pending).")
+
+def flush():
+    """Add every document queued by news_embedding to the vector store"""
+    if not _pending_docs:
         print("No new documents to add.")
+        return 0
+
+    count = len(_pending_docs)
+    for batch in _batched(_pending_docs):
+        _add_batch(batch)
+    _pending_docs.clear()
 
-    print(f"Vector store saved to: {os.path.abspath('./chroma_langchain_db')}")
+    print(f"Added {count} new documents to vector store.")
+    print(f"Vector store saved to: {os.path.abspath(PERSIST_DIRECTORY)}")
+    return count
 
 def get_week_tag():
     """Get current week tag"""
@@ -78,11 +283,33 @@ def get_week_tag():
     year, week, _ = datetime.now().isocalendar()
     return f"{year}-W{week:02d}"
 
+# Files above this size are streamed with ijson rather than decoded in one piece
+STREAM_THRESHOLD_BYTES = 10 * 1024 * 1024
+
+def _read_articles(file_path):
+    """Read the articles from a news JSON file (a bare list or an object with an articles key)"""
+    if file_path.stat().st_size <= STREAM_THRESHOLD_BYTES:
+        data = orjson.loads(file_path.read_bytes())
+        # Handle both list format and object with articles key
+        return data if isinstance(data, list) else data.get("articles", [])
+
+    with open(file_path, "rb") as f:
+        is_list = f.read(64).lstrip().startswith(b"[")
+        f.seek(0)
+        return list(ijson.items(f, "item" if is_list else "articles.item", use_float=True))
+
+def _load_week_file(file_path, prefix):
+    """Read one weekly file and tag its articles with the week from the filename"""
+    week_name = file_path.stem.replace(prefix, "")
+    articles = _read_articles(file_path)
+    for article in articles:
+        article["week"] = week_name
+    return week_name, articles
+
 def load_all_articles():
     """Load all available articles from data directory"""
     # Get the project root directory
-    project_root = Path(__file__).parent.parent
-    data_dir = project_root / "data"
+    data_dir = DATA_DIR
     all_articles = []
     
     print(f"Looking for data files in: {data_dir}")
@@ -91,70 +318,124 @@ def load_all_articles():
     general_file = data_dir / "mit_ai_news.json"
     if general_file.exists():
         print(f"Loading general news from: {general_file}")
-        with open(general_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            # Handle both list format and object with articles key
-            if isinstance(data, list):
-                articles = data
-            else:
-                articles = data.get("articles", [])
-            
-            for article in articles:
-                article["week"] = "all"
-                all_articles.append(article)
+        articles = _read_articles(general_file)
+        for article in articles:
+            article["week"] = "all"
+            all_articles.append(article)
         print(f"Loaded {len(articles)} articles from general news")
     
-    # Load combined weekly files first (preferred - includes all sources)
-    combined_files = list(data_dir.glob("combined-week-*.json"))
-    print(f"Found {len(combined_files)} combined weekly files")
+    # One pass over the weekly files; a combined file (all sources) replaces the individual one for its week
+    files_by_week = {}
+    for file_path in data_dir.glob("*week-*.json"):
+        name = file_path.name
+        if name.startswith("combined-week-"):
+            prefix, label = "combined-week-", "combined week"
+        elif name.startswith("week-"):
+            prefix, label = "week-", "individual week"
+        else:
+            continue  # e.g. techmeme-week-*, already part of the combined files
+        week_name = file_path.stem.replace(prefix, "")
+        if week_name not in files_by_week or prefix == "combined-week-":
+            files_by_week[week_name] = (file_path, prefix, label)
     
-    for file_path in combined_files:
-        week_name = file_path.stem.replace("combined-week-", "")
-        print(f"Loading combined week {week_name} from: {file_path}")
-        with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            # Handle both list format and object with articles key
-            if isinstance(data, list):
-                articles = data
-            else:
-                articles = data.get("articles", [])
-            
-            for article in articles:
-                article["week"] = week_name
-                all_articles.append(article)
-        print(f"Loaded {len(articles)} articles from combined week {week_name}")
+    jobs = [files_by_week[week_name] for week_name in sorted(files_by_week)]
+    combined_count = sum(1 for _, prefix, _ in jobs if prefix == "combined-week-")
+    print(f"Found {combined_count} combined and {len(jobs) - combined_count} individual weekly files to load")
     
-    # Load individual weekly files (fallback)
-    weekly_files = list(data_dir.glob("week-*.json"))
-    print(f"Found {len(weekly_files)} individual weekly files")
+    # Files are independent, so read and parse them concurrently; results keep the job order
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda job: _load_week_file(job[0], job[1]), jobs))
     
-    for file_path in weekly_files:
-        week_name = file_path.stem.replace("week-", "")
-        # Skip if we already loaded this week from combined files
-        if any(f"combined-week-{week_name}.json" in str(f) for f in combined_files):
-            print(f"Skipping individual week {week_name} (already loaded from combined file)")
-            continue
-            
-        print(f"Loading individual week {week_name} from: {file_path}")
-        with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            # Handle both list format and object with articles key
-            if isinstance(data, list):
-                articles = data
-            else:
-                articles = data.get("articles", [])
-            
-            for article in articles:
-                article["week"] = week_name
-                all_articles.append(article)
-        print(f"Loaded {len(articles)} articles from individual week {week_name}")
+    for (file_path, _, label), (week_name, articles) in zip(jobs, results):
+        all_articles.extend(articles)
+        print(f"Loaded {len(articles)} articles from {label} {week_name} ({file_path})")
+    
+    # The same article can sit in several files; embed it once, tagged with a specific week when it has one
+    unique_articles = {}
+    for article in all_articles:
+        link = article['link']
+        if link not in unique_articles or unique_articles[link]["week"] == "all":
+            unique_articles[link] = article
     
-    print(f"Total articles loaded: {len(all_articles)}")
-    return all_articles
+    print(f"Total articles loaded: {len(all_articles)} ({len(unique_articles)} unique)")
+    return list(unique_articles.values())
+
+def _article_documents(articles, existing_links):
+    """Yield a Document for each article whose link isn't in ``existing_links``"""
+    for article in articles:
+        if article['link'] in existing_links:
+            continue
+        # Get summary or description, fallback to content if neither exists
+        summary = article.get('summary') or article.get('description') or article.get('content', '')[:500] + "..."
+        metadata = {
+            "link": article['link'],
+            "week": article['week'],
+            "title": article['title'],
+            "summary": summary,
+            "source": article.get('source', 'Unknown')
+        }
+        yield Document(page_content=_CONTENT_TMPL(metadata), metadata=metadata)
+
+def bulk_build_store():
+    """One-shot backfill: embed every new article in one call, then insert them in large batches"""
+    all_articles = load_all_articles()
+    seen_links = get_seen_links()
+
+    # Keep the first copy of each link so one backfill never inserts an article twice
+    docs = {}
+    for doc in _article_documents(all_articles, seen_links):
+        docs.setdefault(doc.metadata["link"], doc)
+    docs = list(docs.values())
+    if not docs:
+        print("No new documents to add.")
+        return 0
+
+    texts = [doc.page_content for doc in docs]
+    metadatas = [doc.metadata for doc in docs]
+    vectors = cached_embed(texts)
+
+    collection = get_vector_store()._collection
+    for start in range(0, len(docs), ADD_BATCH_SIZE):
+        end = start + ADD_BATCH_SIZE
+        collection.add(
+            ids=[uuid4().hex for _ in texts[start:end]],
+            embeddings=vectors[start:end],
+            documents=texts[start:end],
+            metadatas=metadatas[start:end],
+        )
+
+    # Persist the seen links once for the whole backfill rather than per batch
+    seen_links.update(doc.metadata["link"] for doc in docs)
+    save_seen_links()
+    _clear_semantic_cache()
+
+    print(f"Bulk-added {len(docs)} documents to vector store.")
+    return len(docs)
 
 # Global flag to track initialization
 _vector_store_initialized = False
 
+# Written after a successful ingest; a matching data signature on restart means nothing new to embed
+INITIALIZED_SENTINEL = Path(PERSIST_DIRECTORY) / ".initialized"
+
+def _data_signature():
+    """Fingerprint the target collection and the data files (name, size, mtime) without reading them"""
+    entries = []
+    if DATA_DIR.exists():
+        with os.scandir(DATA_DIR) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append(f"{entry.name}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.sha256("\n".join([COLLECTION_NAME, *sorted(entries)]).encode("utf-8")).hexdigest()
+
+def _read_sentinel():
+    """Return the last ingest's sentinel contents, or None if there isn't a readable one"""
+    try:
+        return orjson.loads(INITIALIZED_SENTINEL.read_bytes())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return None
+
 def initialize_vector_store():
     """Initialize vector store with all available articles"""
     global _vector_store_initialized
@@ -164,55 +445,40 @@ def initialize_vector_store():
         return
         
     try:
+        # Skip reloading every file when nothing changed since the last ingest
+        signature = _data_signature()
+        sentinel = _read_sentinel()
+        if sentinel and sentinel.get("signature") == signature:
+            print(f"Vector store up to date ({sentinel.get('documents', 0)} documents indexed)")
+            _vector_store_initialized = True
+            return
+        
         all_articles = load_all_articles()
         if not all_articles:
             print("No articles found to embed")
             return
         
-        # Get existing links
-        existing_links = set()
-        try:
-            existing_metadatas = vector_store._collection.get()["metadatas"]
-            for meta in existing_metadatas:
-                if meta and meta.get("link"):
-                    existing_links.add(meta["link"])
-        except Exception:
-            pass
+        # Get existing links; batches add theirs as they are written
+        existing_links = get_seen_links()
         
-        docs_to_add = []
-        for article in all_articles:
-            # Get summary or description, fallback to content if neither exists
-            summary = article.get('summary') or article.get('description') or article.get('content', '')[:500] + "..."
-            source = article.get('source', 'Unknown')
-            content = f"title: {article['title']} | summary: {summary} | link: {article['link']} | source: {source}"
-            if article['link'] not in existing_links:
-                docs_to_add.append(Document(
-                    page_content=content,
-                    metadata={
-                        "link": article['link'],
-                        "week": article['week'],
-                        "title": article['title'],
-                        "source": source
-                    }
-                ))
+        added = 0
+        for batch in _batched(_article_documents(all_articles, existing_links)):
+            _add_batch(batch)
+            added += len(batch)
         
-        if docs_to_add:
-            vector_store.add_documents(docs_to_add)
-            print(f"Added {len(docs_to_add)} new documents to vector store.")
+        if added:
+            print(f"Added {added} new documents to vector store.")
         else:
             print("No new documents to add.")
+        
+        INITIALIZED_SENTINEL.parent.mkdir(parents=True, exist_ok=True)
+        INITIALIZED_SENTINEL.write_bytes(orjson.dumps({"signature": signature, "documents": len(existing_links)}))
             
         _vector_store_initialized = True
             
     except Exception as e:
         print(f"Error initializing vector store: {e}")
 
-# Only run if this script is executed directly
-if __name__ == "__main__":
-    # Initialize vector store with all available articles instead of hardcoded week
-    initialize_vector_store()
-
-
 # FIXED: Proper confidence calculation for cosine distance
 def distance_to_confidence(distance):
     # Convert cosine distance to cosine similarity
@@ -222,45 +488,43 @@ def distance_to_confidence(distance):
     return max(0, min(1, cosine_similarity))
 
 
-# Example query
-query = "VaxSeer flu vaccine AI"  
-docs_scores = vector_store.similarity_search_with_score(query, k=2)
+# Only run if this script is executed directly
+if __name__ == "__main__":
+    # Initialize vector store with all available articles instead of hardcoded week
+    initialize_vector_store()
 
-threshold = 0.25 
+    # Example query
+    query = "VaxSeer flu vaccine AI"  
+    docs_scores = get_vector_store().similarity_search_with_score(query, k=2)
 
-# Filter results based on threshold
-filtered_results = [
-    (doc, distance_to_confidence(score)) 
-    for doc, score in docs_scores
-    if distance_to_confidence(score) >= threshold
-]
+    threshold = 0.25 
 
-# Deduplicate by link
-unique_links = set()
-deduped_results = []
-for doc, confidence in filtered_results:
-    # Extract link robustly
-    try:
-        parts = {}
-        for item in doc.page_content.split(" | "):
-            if ": " in item:
-                key, value = item.split(": ", 1)
-                parts[key] = value
-        link = parts.get("link", None)
-    except Exception:
-        link = None
-
-    if link and link not in unique_links:
-        unique_links.add(link)
-        deduped_results.append((parts, confidence))
-
-# Handle no results case
-if not deduped_results:
-    print("No results found")
-else:
-    for i, (parts, confidence) in enumerate(deduped_results, start=1):
-        print(f"\nResult {i}:")
-        print("Title:", parts.get("title", "Unknown"))
-        print("Summary:", parts.get("summary", "Unknown"))
-        print("Link:", parts.get("link", "Unknown"))
-        print("Confidence:", round(confidence, 3))
\ No newline at end of file
+    # Filter results based on threshold
+    filtered_results = [
+        (doc, distance_to_confidence(score)) 
+        for doc, score in docs_scores
+        if distance_to_confidence(score) >= threshold
+    ]
+
+    # Deduplicate by link
+    unique_links = set()
+    deduped_results = []
+    for doc, confidence in filtered_results:
+        # Title, summary, link and source are all stored in the metadata
+        parts = doc.metadata
+        link = parts.get("link")
+
+        if link and link not in unique_links:
+            unique_links.add(link)
+            deduped_results.append((parts, confidence))
+
+    # Handle no results case
+    if not deduped_results:
+        print("No results found")
+    else:
+        for i, (parts, confidence) in enumerate(deduped_results, start=1):
+            print(f"\nResult {i}:")
+            print("Title:", parts.get("title", "Unknown"))
+            print("Summary:", parts.get("summary", "Unknown"))
+            print("Link:", parts.get("link", "Unknown"))
+            print("Confidence:", round(confidence, 3))